@@ -11,11 +11,18 @@ H → Toggle help overlay (on-screen instructions)
 ESC → Quit the program
 '''
 
-import json, math, random, time, pathlib
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import json, math, random, threading, time, pathlib
+from typing import Optional, Tuple
+import numpy as np
 import pygame
 
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
 # =========================
 # Config (tweak to taste)
 # =========================
@@ -31,6 +38,17 @@ WELL_MASS = 8e4
 PARTICLE_MASS = 1.0
 VSYNC = True
 TRAIL_ALPHA_SUB = 14          # lower = longer trails
+GRID_CELL = 30.0              # spatial-hash cell size (~sqrt(SOFTENING2*100))
+GRID_MAX_N = 3000             # above this Barnes–Hut wins again
+GRID_MAX_CELLS = 1 << 16
+LOD_MARGIN = 200.0            # world-units halo around the viewport
+LOD_EVERY = 4                 # off-screen particles integrate every Nth step
+
+# float32 mirrors of the hot constants — physics runs entirely in float32
+# (halves bandwidth, doubles SIMD width); camera/HUD math stays float64
+G_F32 = np.float32(G_CONST)
+SOFT2_F32 = np.float32(SOFTENING2)
+MAX_SPEED_F32 = np.float32(PARTICLE_MAX_SPEED)
 
 # Colors
 HUD_COLOR = (220, 230, 245)
@@ -46,151 +64,262 @@ def lerp(a, b, t): return a + (b - a) * t
 # Camera with smoothing
 # =========================
 class Camera:
+    # Plain float attributes throughout — world_to_screen/screen_to_world run
+    # in hot paths and per-call pygame.Vector2 allocations added up.
     def __init__(self):
         self.zoom = 1.0
-        self.offset = pygame.Vector2(0, 0)
+        self.ox = 0.0
+        self.oy = 0.0
         self._target_zoom = 1.0
-        self._target_offset = pygame.Vector2(0, 0)
+        self.tox = 0.0
+        self.toy = 0.0
 
-    def world_to_screen(self, p: pygame.Vector2) -> pygame.Vector2:
-        return (p - self.offset) * self.zoom
+    def world_to_screen(self, x: float, y: float) -> Tuple[float, float]:
+        return (x - self.ox) * self.zoom, (y - self.oy) * self.zoom
 
-    def screen_to_world(self, p: Tuple[float, float]) -> pygame.Vector2:
-        return pygame.Vector2(p[0] / self.zoom, p[1] / self.zoom) + self.offset
+    def screen_to_world(self, p: Tuple[float, float]) -> Tuple[float, float]:
+        return p[0] / self.zoom + self.ox, p[1] / self.zoom + self.oy
 
     def zoom_at(self, factor: float, screen_pos: Tuple[int, int]):
         # cursor-centric zoom with smoothed target
-        before = self.screen_to_world(screen_pos)
+        bx, by = self.screen_to_world(screen_pos)
         self._target_zoom = clamp(self._target_zoom * factor, 0.15, 6.0)
-        after = (before - self._target_offset) * (self._target_zoom / self.zoom) + self._target_offset
         # adjust target offset to keep cursor anchored
-        self._target_offset += (before - self.screen_to_world(screen_pos))
+        ax, ay = self.screen_to_world(screen_pos)
+        self.tox += bx - ax
+        self.toy += by - ay
 
-    def pan(self, delta_screen: pygame.Vector2):
-        self._target_offset -= (delta_screen / self.zoom)
+    def pan(self, dx: float, dy: float):
+        self.tox -= dx / self.zoom
+        self.toy -= dy / self.zoom
 
-    def jump_to(self, pos_world: pygame.Vector2):
-        self.offset = pygame.Vector2(pos_world) - pygame.Vector2(WIDTH/2, HEIGHT/2) / self.zoom
-        self._target_offset = pygame.Vector2(self.offset)
+    def jump_to(self, x: float, y: float):
+        self.ox = x - (WIDTH / 2) / self.zoom
+        self.oy = y - (HEIGHT / 2) / self.zoom
+        self.tox = self.ox
+        self.toy = self.oy
 
     def update(self, dt: float):
         # critically-damped like smoothing
         z_smooth = 1 - pow(0.001, dt * 8)
         o_smooth = 1 - pow(0.001, dt * 10)
         self.zoom = lerp(self.zoom, self._target_zoom, z_smooth)
-        self.offset.x = lerp(self.offset.x, self._target_offset.x, o_smooth)
-        self.offset.y = lerp(self.offset.y, self._target_offset.y, o_smooth)
+        self.ox = lerp(self.ox, self.tox, o_smooth)
+        self.oy = lerp(self.oy, self.toy, o_smooth)
 
 # =========================
-# Data
-# =========================
-@dataclass
-class Well:
-    pos: pygame.Vector2
-    mass: float = WELL_MASS
-    radius: float = 10.0
-
-@dataclass
-class Particle:
-    pos: pygame.Vector2
-    vel: pygame.Vector2
-    mass: float = PARTICLE_MASS
-    alive: bool = True
-    hue: float = 0.6   # for palette variations
-
+# Barnes–Hut quadtree on flat node arrays
 # =========================
-# Barnes–Hut Quadtree
-# =========================
-class Quad:
-    __slots__ = ("cx", "cy", "hw", "mass", "comx", "comy", "body", "nw", "ne", "sw", "se", "has_children")
-    def __init__(self, cx, cy, hw):
-        self.cx, self.cy, self.hw = cx, cy, hw
-        self.mass = 0.0
-        self.comx = 0.0
-        self.comy = 0.0
-        self.body: Optional[Particle] = None
-        self.nw = self.ne = self.sw = self.se = None
-        self.has_children = False
-
-    def contains(self, p: Particle):
-        return (self.cx - self.hw <= p.pos.x < self.cx + self.hw and
-                self.cy - self.hw <= p.pos.y < self.cy + self.hw)
-
-    def _child(self, p: Particle):
-        if p.pos.x < self.cx:
-            if p.pos.y < self.cy: return "nw"
-            else: return "sw"
-        else:
-            if p.pos.y < self.cy: return "ne"
-            else: return "se"
-
-    def subdivide(self):
-        h = self.hw / 2
-        self.nw = Quad(self.cx - h, self.cy - h, h)
-        self.ne = Quad(self.cx + h, self.cy - h, h)
-        self.sw = Quad(self.cx - h, self.cy + h, h)
-        self.se = Quad(self.cx + h, self.cy + h, h)
-        self.has_children = True
-
-    def insert(self, p: Particle):
-        if self.hw < 1:  # too small
-            # accumulate mass but don't place body to avoid infinite recursion
-            self._accumulate(p)
-            return
-        if self.body is None and not self.has_children:
-            self.body = p
-            self.mass = p.mass
-            self.comx, self.comy = p.pos.x, p.pos.y
-            return
-        if not self.has_children:
-            self.subdivide()
-            if self.body is not None:
-                getattr(self, self._child(self.body)).insert(self.body)
-                self.body = None
-        getattr(self, self._child(p)).insert(p)
-        self._accumulate(p)
-
-    def _accumulate(self, p: Particle):
-        m = self.mass + p.mass
-        if m == 0: return
-        self.comx = (self.comx * self.mass + p.pos.x * p.mass) / m
-        self.comy = (self.comy * self.mass + p.pos.y * p.mass) / m
-        self.mass = m
-
-    def force(self, p: Particle, theta: float):
-        # returns ax, ay contribution from this node on p
-        if self.mass == 0 or (self.body is p):
-            return 0.0, 0.0
-        dx = self.comx - p.pos.x
-        dy = self.comy - p.pos.y
-        r2 = dx*dx + dy*dy + SOFTENING2
-        # opening criterion
-        if not self.has_children:
-            # leaf or single body
-            inv_r = 1.0 / math.sqrt(r2)
-            inv_r3 = inv_r * inv_r * inv_r
-            a = G_CONST * self.mass * inv_r3
-            return a*dx, a*dy
-        s = self.hw * 2
-        if s * s / r2 < theta * theta:
-            inv_r = 1.0 / math.sqrt(r2)
-            inv_r3 = inv_r * inv_r * inv_r
-            a = G_CONST * self.mass * inv_r3
-            return a*dx, a*dy
-        ax = ay = 0.0
-        if self.nw: a1, b1 = self.nw.force(p, theta); ax += a1; ay += b1
-        if self.ne: a1, b1 = self.ne.force(p, theta); ax += a1; ay += b1
-        if self.sw: a1, b1 = self.sw.force(p, theta); ax += a1; ay += b1
-        if self.se: a1, b1 = self.se.force(p, theta); ax += a1; ay += b1
-        return ax, ay
+# Nodes live in preallocated SoA slabs owned by GravitySim; children are
+# int32 indices (-1 = none; subdivision always creates all four). Both the
+# build and the traversal are plain functions over those slabs so numba can
+# JIT them when available and plain Python can still run them when not.
+
+def _rsqrt(x):
+    # Quake-style fast reciprocal square root (bit hack + one Newton step,
+    # ~0.2% max error — plenty for a visual sim with SOFTENING2 = 9).
+    i = np.uint32(np.uint32(0x5f3759df) - (np.float32(x).view(np.uint32) >> np.uint32(1)))
+    y = i.view(np.float32)
+    return y * (np.float32(1.5) - np.float32(0.5) * np.float32(x) * y * y)
+
+def _rsqrt_arr(r2):
+    # Array form of _rsqrt for the NumPy broadcast path (r2 must be float32).
+    i = np.uint32(0x5f3759df) - (r2.view(np.uint32) >> np.uint32(1))
+    y = i.view(np.float32)
+    return y * (np.float32(1.5) - np.float32(0.5) * r2 * y * y)
+
+def _tree_insert(x_arr, y_arr, m_arr, n_nodes,
+                 node_cx, node_cy, node_hw, node_mass, node_comx, node_comy,
+                 node_child, node_has_body, node_bx, node_by, node_bm):
+    # Iteratively insert every body; returns the updated node count.
+    cap = node_cx.shape[0]
+    for b in range(x_arr.shape[0]):
+        x = x_arr[b]; y = y_arr[b]; m = m_arr[b]
+        node = 0
+        while True:
+            hw = node_hw[node]
+            out_of_room = n_nodes + 4 > cap
+            if hw < 1.0 or out_of_room:
+                # too small (or slab full): accumulate mass without placing a body
+                total = node_mass[node] + m
+                node_comx[node] = (node_comx[node] * node_mass[node] + x * m) / total
+                node_comy[node] = (node_comy[node] * node_mass[node] + y * m) / total
+                node_mass[node] = total
+                break
+            has_children = node_child[node, 0] >= 0
+            if not has_children and not node_has_body[node]:
+                node_has_body[node] = True
+                node_bx[node] = x; node_by[node] = y; node_bm[node] = m
+                node_mass[node] = m
+                node_comx[node] = x; node_comy[node] = y
+                break
+            if not has_children:
+                # subdivide and push the resident body one level down
+                h = hw * 0.5
+                cx = node_cx[node]; cy = node_cy[node]
+                for k in range(4):
+                    c = n_nodes + k
+                    node_cx[c] = cx - h if (k == 0 or k == 2) else cx + h
+                    node_cy[c] = cy - h if (k == 0 or k == 1) else cy + h
+                    node_hw[c] = h
+                    node_mass[c] = 0.0
+                    node_comx[c] = 0.0; node_comy[c] = 0.0
+                    node_child[c, 0] = -1; node_child[c, 1] = -1
+                    node_child[c, 2] = -1; node_child[c, 3] = -1
+                    node_has_body[c] = False
+                    node_child[node, k] = c
+                n_nodes += 4
+                bx = node_bx[node]; by = node_by[node]
+                k = (0 if by < cy else 2) + (0 if bx < cx else 1)
+                c = node_child[node, k]
+                node_has_body[c] = True
+                node_bx[c] = bx; node_by[c] = by; node_bm[c] = node_bm[node]
+                node_mass[c] = node_bm[node]
+                node_comx[c] = bx; node_comy[c] = by
+                node_has_body[node] = False
+            # internal node: fold the body into the running COM and descend
+            total = node_mass[node] + m
+            node_comx[node] = (node_comx[node] * node_mass[node] + x * m) / total
+            node_comy[node] = (node_comy[node] * node_mass[node] + y * m) / total
+            node_mass[node] = total
+            k = (0 if y < node_cy[node] else 2) + (0 if x < node_cx[node] else 1)
+            node = node_child[node, k]
+    return n_nodes
+
+def _bh_force(px, py, node_hw, node_gm, node_comx, node_comy,
+              node_child, theta2, ax, ay):
+    # embarrassingly parallel: the tree is read-only and each iteration
+    # writes only ax[i]/ay[i], so prange needs no atomics (the per-i stack
+    # is allocated inside the loop and thus thread-private).
+    # theta2 and node_gm (= G * node mass) are hoisted loop invariants:
+    # the JIT would hoist them anyway, the Python fallback won't.
+    for i in prange(px.shape[0]):
+        x = px[i]; y = py[i]
+        axi = np.float32(0.0); ayi = np.float32(0.0)
+        stack = np.empty(128, np.int32)
+        stack[0] = 0
+        top = 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            gm = node_gm[node]
+            if gm == 0.0:
+                continue
+            dx = node_comx[node] - x
+            dy = node_comy[node] - y
+            r2 = dx*dx + dy*dy + SOFT2_F32
+            s = node_hw[node] * np.float32(2.0)
+            if node_child[node, 0] < 0 or s * s < theta2 * r2:
+                inv_r = _rsqrt(r2)
+                inv_r3 = inv_r * inv_r * inv_r
+                a = gm * inv_r3
+                axi += a * dx; ayi += a * dy
+            else:
+                for k in range(4):
+                    stack[top] = node_child[node, k]
+                    top += 1
+        ax[i] = axi; ay[i] = ayi
+
+def _grid_force(px, py, mass, wx, wy, wmass, cellx, celly, order, cell_start,
+                cell_mass, cell_comx, cell_comy, occupied, ncol, ax, ay):
+    # Near field: direct sum over the 3x3 neighbor cells. Far field: one
+    # monopole interaction per occupied cell (its COM and total mass).
+    for i in range(px.shape[0]):
+        x = px[i]; y = py[i]
+        cxi = cellx[i]; cyi = celly[i]
+        axi = np.float32(0.0); ayi = np.float32(0.0)
+        for w in range(wx.shape[0]):
+            dx = wx[w] - x; dy = wy[w] - y
+            r2 = dx*dx + dy*dy + SOFT2_F32
+            inv_r = _rsqrt(r2)
+            a = G_F32 * wmass[w] * inv_r * inv_r * inv_r
+            axi += a * dx; ayi += a * dy
+        for oc_i in range(occupied.shape[0]):
+            oc = occupied[oc_i]
+            ocx = oc % ncol; ocy = oc // ncol
+            if abs(ocx - cxi) <= 1 and abs(ocy - cyi) <= 1:
+                for s in range(cell_start[oc], cell_start[oc + 1]):
+                    j = order[s]
+                    if j == i:
+                        continue
+                    dx = px[j] - x; dy = py[j] - y
+                    r2 = dx*dx + dy*dy + SOFT2_F32
+                    inv_r = _rsqrt(r2)
+                    a = G_F32 * mass[j] * inv_r * inv_r * inv_r
+                    axi += a * dx; ayi += a * dy
+            else:
+                dx = cell_comx[oc] - x; dy = cell_comy[oc] - y
+                r2 = dx*dx + dy*dy + SOFT2_F32
+                inv_r = _rsqrt(r2)
+                a = G_F32 * cell_mass[oc] * inv_r * inv_r * inv_r
+                axi += a * dx; ayi += a * dy
+        ax[i] = axi; ay[i] = ayi
+
+if HAVE_NUMBA:
+    # nogil lets the kernels overlap with the render thread (see PhysicsThread)
+    _rsqrt = njit(inline='always', fastmath=True)(_rsqrt)
+    _tree_insert = njit(cache=True, nogil=True)(_tree_insert)
+    bh_force = njit(cache=True, fastmath=True, parallel=True, nogil=True)(_bh_force)
+    _grid_force = njit(cache=True, fastmath=True, nogil=True)(_grid_force)
+else:
+    bh_force = _bh_force
 
 # =========================
 # Simulator
 # =========================
 class GravitySim:
     def __init__(self):
-        self.wells: List[Well] = []
-        self.particles: List[Particle] = []
+        # Wells: parallel arrays (few entries, appended on demand)
+        self.wx = np.zeros(0, dtype=np.float32)
+        self.wy = np.zeros(0, dtype=np.float32)
+        self.wmass = np.zeros(0, dtype=np.float32)
+        self.wradius = np.zeros(0, dtype=np.float32)
+        # Particles: preallocated SoA slabs; [:self.n] is live
+        self.px = np.zeros(MAX_PARTICLES, dtype=np.float32)
+        self.py = np.zeros(MAX_PARTICLES, dtype=np.float32)
+        self.vx = np.zeros(MAX_PARTICLES, dtype=np.float32)
+        self.vy = np.zeros(MAX_PARTICLES, dtype=np.float32)
+        self.mass = np.zeros(MAX_PARTICLES, dtype=np.float32)
+        self.hue = np.zeros(MAX_PARTICLES, dtype=np.float32)   # for palette variations
+        self.n = 0
+        # Flat quadtree node slabs (allocated once; reset by bumping _n_nodes)
+        cap = 4 * MAX_PARTICLES
+        self._node_cx = np.zeros(cap, dtype=np.float32)
+        self._node_cy = np.zeros(cap, dtype=np.float32)
+        self._node_hw = np.zeros(cap, dtype=np.float32)
+        self._node_mass = np.zeros(cap, dtype=np.float32)
+        self._node_comx = np.zeros(cap, dtype=np.float32)
+        self._node_comy = np.zeros(cap, dtype=np.float32)
+        self._node_child = np.full((cap, 4), -1, dtype=np.int32)
+        self._node_has_body = np.zeros(cap, dtype=np.bool_)
+        self._node_bx = np.zeros(cap, dtype=np.float32)
+        self._node_by = np.zeros(cap, dtype=np.float32)
+        self._node_bm = np.zeros(cap, dtype=np.float32)
+        self._node_gm = np.zeros(cap, dtype=np.float32)   # G * node mass, filled per build
+        self._n_nodes = 0
+        # Cached world bounds (cx, cy, half): refreshed every few builds with a
+        # margin particles can't outrun, invalidated when bodies are added
+        self._bounds = None
+        self._bounds_age = 0
+        self._bounds_refresh = 16
+        self._lod_tick = 0
+        # The tree is rebuilt only every _tree_rebuild_every steps; between
+        # rebuilds the stale COMs are reused (positions drift by at most
+        # v*dt per step, which the opening criterion tolerates). Mutations
+        # reset _tree_age so the next step rebuilds from scratch.
+        self._tree_age = 0
+        self._tree_rebuild_every = 4
+        # Physics runs on its own thread (PhysicsThread); mutations take the
+        # lock, and the renderer reads double-buffered position snapshots so
+        # it never sees a half-integrated frame. publish_snapshot() is always
+        # called with the lock held, so only the buffer swap is lock-free.
+        self.lock = threading.Lock()
+        self._snap_px = np.zeros((2, MAX_PARTICLES), dtype=np.float32)
+        self._snap_py = np.zeros((2, MAX_PARTICLES), dtype=np.float32)
+        self._snap_vx = np.zeros((2, MAX_PARTICLES), dtype=np.float32)
+        self._snap_vy = np.zeros((2, MAX_PARTICLES), dtype=np.float32)
+        self._snap_n = 0
+        self._snap_read = 0
         self.time_scale = 1.0
         self.paused = False
         self.trails = True
@@ -200,154 +329,381 @@ class GravitySim:
         self.theta = 0.7
         self.seed = 7
         random.seed(self.seed)
-
-    def add_well(self, pos_world: pygame.Vector2, mass=WELL_MASS):
-        self.wells.append(Well(pos_world, mass=mass))
-
-    def remove_well_at(self, pos_world: pygame.Vector2, radius_px: float = 20):
-        if not self.wells: return
-        closest_i, closest_d2 = None, float("inf")
-        for i, w in enumerate(self.wells):
-            d2 = (w.pos - pos_world).length_squared()
-            if d2 < closest_d2:
-                closest_i, closest_d2 = i, d2
-        if closest_i is not None and closest_d2 <= (radius_px * radius_px):
-            self.wells.pop(closest_i)
-
-    def add_particle(self, pos_world: pygame.Vector2, vel_world: pygame.Vector2):
-        if len(self.particles) < MAX_PARTICLES:
-            self.particles.append(Particle(pos=pygame.Vector2(pos_world),
-                                           vel=pygame.Vector2(vel_world),
-                                           mass=PARTICLE_MASS,
-                                           hue=random.random()))
+        self.rng = np.random.default_rng(self.seed)
+
+    @property
+    def n_wells(self):
+        return len(self.wx)
+
+    def publish_snapshot(self):
+        # copy the live slice into the write buffer, then flip the read index
+        # (callers hold self.lock, so writers never collide; the renderer
+        # reads the other buffer without locking)
+        w = 1 - self._snap_read
+        n = self.n
+        self._snap_px[w, :n] = self.px[:n]
+        self._snap_py[w, :n] = self.py[:n]
+        self._snap_vx[w, :n] = self.vx[:n]
+        self._snap_vy[w, :n] = self.vy[:n]
+        self._snap_n = n
+        self._snap_read = w
+
+    def snapshot(self):
+        # (px, py, vx, vy) views of the most recently published state
+        r = self._snap_read
+        n = self._snap_n
+        return (self._snap_px[r, :n], self._snap_py[r, :n],
+                self._snap_vx[r, :n], self._snap_vy[r, :n])
+
+    def add_well(self, pos_world: Tuple[float, float], mass=WELL_MASS, radius=10.0):
+        with self.lock:
+            self.wx = np.append(self.wx, np.float32(pos_world[0]))
+            self.wy = np.append(self.wy, np.float32(pos_world[1]))
+            self.wmass = np.append(self.wmass, np.float32(mass))
+            self.wradius = np.append(self.wradius, np.float32(radius))
+            self._bounds = None
+
+    def remove_well_at(self, pos_world: Tuple[float, float], radius_px: float = 20):
+        if self.n_wells == 0: return
+        d2 = (self.wx - pos_world[0]) ** 2 + (self.wy - pos_world[1]) ** 2
+        i = int(np.argmin(d2))
+        if d2[i] <= radius_px * radius_px:
+            with self.lock:
+                self.wx = np.delete(self.wx, i)
+                self.wy = np.delete(self.wy, i)
+                self.wmass = np.delete(self.wmass, i)
+                self.wradius = np.delete(self.wradius, i)
+
+    def add_particle(self, pos_world: Tuple[float, float], vel_world: Tuple[float, float]):
+        i = self.n
+        if i >= MAX_PARTICLES:
+            return
+        with self.lock:
+            self.px[i] = pos_world[0]; self.py[i] = pos_world[1]
+            self.vx[i] = vel_world[0]; self.vy[i] = vel_world[1]
+            self.mass[i] = PARTICLE_MASS
+            self.hue[i] = random.random()
+            self.n = i + 1
+            self._bounds = None
+            self._tree_age = 0
+            self.publish_snapshot()
+
+    def add_particles_bulk(self, px, py, vx, vy):
+        # One slice write per field; anything past MAX_PARTICLES is dropped.
+        k = min(len(px), MAX_PARTICLES - self.n)
+        if k <= 0:
+            return
+        with self.lock:
+            i = self.n
+            self.px[i:i+k] = px[:k]; self.py[i:i+k] = py[:k]
+            self.vx[i:i+k] = vx[:k]; self.vy[i:i+k] = vy[:k]
+            self.mass[i:i+k] = PARTICLE_MASS
+            self.hue[i:i+k] = self.rng.random(k)
+            self.n = i + k
+            self._bounds = None
+            self._tree_age = 0
+            self.publish_snapshot()
+
+    def remove_particle(self, i: int):
+        # swap-with-last keeps the live slice contiguous
+        last = self.n - 1
+        if i != last:
+            for arr in (self.px, self.py, self.vx, self.vy, self.mass, self.hue):
+                arr[i] = arr[last]
+        self.n = last
+        self._tree_age = 0
 
     def clear_all(self):
-        self.particles.clear()
-        self.wells.clear()
+        with self.lock:
+            self.n = 0
+            self._bounds = None
+            self._tree_age = 0
+            self.wx = np.zeros(0, dtype=np.float32)
+            self.wy = np.zeros(0, dtype=np.float32)
+            self.wmass = np.zeros(0, dtype=np.float32)
+            self.wradius = np.zeros(0, dtype=np.float32)
+            self.publish_snapshot()
 
     # Physics ----------------
 
-    def _build_tree(self):
-        # Determine bounds (square)
-        if not self.particles and not self.wells:
-            return None
-        xs = [p.pos.x for p in self.particles] + [w.pos.x for w in self.wells]
-        ys = [p.pos.y for p in self.particles] + [w.pos.y for w in self.wells]
-        minx, maxx = min(xs), max(xs)
-        miny, maxy = min(ys), max(ys)
+    def _world_bounds(self):
+        # (cx, cy, half) square; recomputed only every _bounds_refresh builds.
+        # The margin covers the furthest any particle can travel before the
+        # next exact refresh, so stale bounds always still contain everything.
+        if self._bounds is not None and self._bounds_age < self._bounds_refresh:
+            self._bounds_age += 1
+            return self._bounds
+        n = self.n
+        px, py = self.px[:n], self.py[:n]
+        if n and self.n_wells:
+            minx = min(px.min(), self.wx.min()); maxx = max(px.max(), self.wx.max())
+            miny = min(py.min(), self.wy.min()); maxy = max(py.max(), self.wy.max())
+        elif n:
+            minx, maxx = px.min(), px.max()
+            miny, maxy = py.min(), py.max()
+        else:
+            minx, maxx = self.wx.min(), self.wx.max()
+            miny, maxy = self.wy.min(), self.wy.max()
+        # _bounds_age counts builds, and builds happen only every
+        # _tree_rebuild_every steps, so the margin must cover the travel
+        # between exact refreshes in *steps*: refresh * rebuild cadence
+        margin = PARTICLE_MAX_SPEED * (
+            self._bounds_refresh * self._tree_rebuild_every / PHYSICS_HZ)
         cx = (minx + maxx) * 0.5
         cy = (miny + maxy) * 0.5
-        half = max(maxx - minx, maxy - miny) * 0.5 + 4.0
-        root = Quad(cx, cy, max(half, 64.0))
+        half = max(maxx - minx, maxy - miny) * 0.5 + 4.0 + margin
+        self._bounds = (cx, cy, max(half, 64.0))
+        self._bounds_age = 0
+        return self._bounds
+
+    def _build_tree(self):
+        n = self.n
+        if n == 0 and self.n_wells == 0:
+            return None
+        cx, cy, half = self._world_bounds()
+        # reset + init root in the slabs
+        self._node_cx[0] = cx
+        self._node_cy[0] = cy
+        self._node_hw[0] = half
+        self._node_mass[0] = 0.0
+        self._node_comx[0] = 0.0; self._node_comy[0] = 0.0
+        self._node_child[0, :] = -1
+        self._node_has_body[0] = False
+        slabs = (self._node_cx, self._node_cy, self._node_hw, self._node_mass,
+                 self._node_comx, self._node_comy, self._node_child,
+                 self._node_has_body, self._node_bx, self._node_by, self._node_bm)
         # Insert wells as massive bodies (optional, improves performance when many wells)
-        for w in self.wells:
-            pseudo = Particle(pos=pygame.Vector2(w.pos), vel=pygame.Vector2(), mass=w.mass)
-            root.insert(pseudo)
-        for p in self.particles:
-            root.insert(p)
-        return root
-
-    def _forces_direct(self, p: Particle):
-        ax = ay = 0.0
-        for w in self.wells:
-            dx = w.pos.x - p.pos.x
-            dy = w.pos.y - p.pos.y
-            r2 = dx*dx + dy*dy + SOFTENING2
-            inv_r = 1.0 / math.sqrt(r2)
+        n_nodes = _tree_insert(self.wx, self.wy, self.wmass, 1, *slabs)
+        n_nodes = _tree_insert(self.px[:n], self.py[:n], self.mass[:n], n_nodes, *slabs)
+        self._n_nodes = n_nodes
+        # fold G into the node masses once per build so the traversal's leaf
+        # branch is a single multiply
+        np.multiply(self._node_mass[:n_nodes], G_F32, out=self._node_gm[:n_nodes])
+        return n_nodes
+
+    def _accel_grid(self):
+        # Uniform spatial hash for the mid-N regime: bin into GRID_CELL-sized
+        # cells (CSR via argsort), then near cells direct + far cells as
+        # monopoles. Returns None when the grid would degenerate (huge area).
+        n = self.n
+        px, py = self.px[:n], self.py[:n]
+        minx = px.min(); miny = py.min()
+        cellx = ((px - minx) * (1.0 / GRID_CELL)).astype(np.int32)
+        celly = ((py - miny) * (1.0 / GRID_CELL)).astype(np.int32)
+        ncol = int(cellx.max()) + 1
+        nrow = int(celly.max()) + 1
+        ncells = ncol * nrow
+        if ncells > GRID_MAX_CELLS:
+            return None
+        ids = celly * ncol + cellx
+        order = np.argsort(ids, kind='stable').astype(np.int32)
+        cell_start = np.searchsorted(ids[order], np.arange(ncells + 1)).astype(np.int32)
+        m = self.mass[:n]
+        cell_mass = np.bincount(ids, weights=m, minlength=ncells).astype(np.float32)
+        safe = np.maximum(cell_mass, 1e-30)
+        cell_comx = (np.bincount(ids, weights=m * px, minlength=ncells) / safe).astype(np.float32)
+        cell_comy = (np.bincount(ids, weights=m * py, minlength=ncells) / safe).astype(np.float32)
+        occupied = np.nonzero(cell_mass > 0)[0].astype(np.int32)
+        ax = np.empty(n, dtype=np.float32)
+        ay = np.empty(n, dtype=np.float32)
+        _grid_force(px, py, m, self.wx, self.wy, self.wmass, cellx, celly, order,
+                    cell_start, cell_mass, cell_comx, cell_comy, occupied, ncol, ax, ay)
+        return ax, ay
+
+    def _accel_direct_np(self):
+        # Broadcast pairwise accelerations: wells always, particle-particle at small N.
+        n = self.n
+        px, py = self.px[:n], self.py[:n]
+        ax = np.zeros(n, dtype=np.float32)
+        ay = np.zeros(n, dtype=np.float32)
+        if self.n_wells:
+            dx = self.wx[None, :] - px[:, None]
+            dy = self.wy[None, :] - py[:, None]
+            r2 = dx*dx + dy*dy + SOFT2_F32
+            inv_r = _rsqrt_arr(r2)
             inv_r3 = inv_r * inv_r * inv_r
-            a = G_CONST * w.mass * inv_r3
-            ax += a * dx; ay += a * dy
-        for q in self.particles:
-            if q is p: continue
-            dx = q.pos.x - p.pos.x
-            dy = q.pos.y - p.pos.y
-            r2 = dx*dx + dy*dy + SOFTENING2
-            inv_r = 1.0 / math.sqrt(r2)
+            gm = G_F32 * self.wmass[None, :] * inv_r3
+            ax += (gm * dx).sum(axis=1)
+            ay += (gm * dy).sum(axis=1)
+        # particle-particle only if small N
+        if n <= 700:
+            dx = px[None, :] - px[:, None]
+            dy = py[None, :] - py[:, None]
+            r2 = dx*dx + dy*dy + SOFT2_F32
+            inv_r = _rsqrt_arr(r2)
             inv_r3 = inv_r * inv_r * inv_r
-            a = G_CONST * q.mass * inv_r3
-            ax += a * dx; ay += a * dy
+            np.fill_diagonal(inv_r3, 0.0)   # no self-interaction
+            gm = G_F32 * self.mass[:n][None, :] * inv_r3
+            ax += (gm * dx).sum(axis=1)
+            ay += (gm * dy).sum(axis=1)
         return ax, ay
 
-    def step(self, dt: float):
-        if not self.particles:
+    def _integrate(self, ax, ay, dt, idx=None):
+        # dt may be a scalar or a per-particle array; idx limits the update
+        # to a subset (used by the viewport LOD).
+        dt = np.float32(dt) if np.isscalar(dt) else dt
+        if idx is None:
+            n = self.n
+            vx, vy = self.vx[:n], self.vy[:n]
+            vx += ax * dt
+            vy += ay * dt
+            sp = np.hypot(vx, vy)
+            # branchless: min(cap, sp)/sp is 1 below the cap, cap/sp above it
+            scale = np.minimum(MAX_SPEED_F32, sp) / np.maximum(sp, np.float32(1e-30))
+            vx *= scale
+            vy *= scale
+            self.px[:n] += vx * dt
+            self.py[:n] += vy * dt
+        else:
+            vx = self.vx[idx] + ax * dt
+            vy = self.vy[idx] + ay * dt
+            sp = np.hypot(vx, vy)
+            # branchless: min(cap, sp)/sp is 1 below the cap, cap/sp above it
+            scale = np.minimum(MAX_SPEED_F32, sp) / np.maximum(sp, np.float32(1e-30))
+            vx *= scale
+            vy *= scale
+            self.vx[idx] = vx; self.vy[idx] = vy
+            self.px[idx] += vx * dt
+            self.py[idx] += vy * dt
+
+    def step(self, dt: float, viewport=None):
+        n = self.n
+        if n == 0:
             return
-        tree = None
-        if self.barnes_hut and (len(self.particles) > 400):
-            tree = self._build_tree()
-
-        # Integrate (leapfrog / velocity Verlet)
-        for p in self.particles:
-            if not p.alive: continue
-            ax = ay = 0.0
-            if tree:
-                axt, ayt = tree.force(p, self.theta)
-                ax += axt; ay += ayt
+        self._lod_tick += 1
+        if self.barnes_hut and (400 < n < GRID_MAX_N):
+            # mid-N sweet spot: grid beats the tree because build cost dominates
+            accel = self._accel_grid()
+            if accel is not None:
+                self._tree_age = 0
+                self._integrate(*accel, dt)
+                return
+        if self.barnes_hut and (n > 400):
+            # viewport LOD: off-screen particles only integrate every
+            # LOD_EVERY'th step (with a catch-up dt), trimming the tree walk
+            idx = None
+            dt_eff = dt
+            if viewport is not None:
+                x0, y0, x1, y1 = viewport
+                px, py = self.px[:n], self.py[:n]
+                on = ((px > x0 - LOD_MARGIN) & (px < x1 + LOD_MARGIN) &
+                      (py > y0 - LOD_MARGIN) & (py < y1 + LOD_MARGIN))
+                if self._lod_tick % LOD_EVERY != 0:
+                    if not on.all():
+                        idx = np.nonzero(on)[0]
+                else:
+                    dt_eff = np.where(on, dt, dt * LOD_EVERY).astype(np.float32)
+            # amortized rebuild: reuse the stale tree for up to K-1 steps
+            if self._tree_age % self._tree_rebuild_every == 0:
+                self._build_tree()
+            self._tree_age += 1
+            theta2 = np.float32(self.theta * self.theta)
+            if idx is None:
+                ax = np.empty(n, dtype=np.float32)
+                ay = np.empty(n, dtype=np.float32)
+                bh_force(self.px[:n], self.py[:n],
+                         self._node_hw, self._node_gm, self._node_comx, self._node_comy,
+                         self._node_child, theta2, ax, ay)
+            else:
+                ax = np.empty(len(idx), dtype=np.float32)
+                ay = np.empty(len(idx), dtype=np.float32)
+                bh_force(self.px[idx], self.py[idx],
+                         self._node_hw, self._node_gm, self._node_comx, self._node_comy,
+                         self._node_child, theta2, ax, ay)
+            self._integrate(ax, ay, dt_eff, idx)
+        else:
+            self._tree_age = 0
+            ax, ay = self._accel_direct_np()
+            self._integrate(ax, ay, dt)
+
+# =========================
+# Physics thread
+# =========================
+class PhysicsThread(threading.Thread):
+    """Runs the fixed-step integrator off the render thread.
+
+    The nogil JIT kernels release the GIL, so force evaluation genuinely
+    overlaps with rendering (and with flip()'s vsync wait). Each batch of
+    steps ends with publish_snapshot(); draw() reads the snapshot without
+    a lock. The renderer only pokes `viewport` (a tuple swap, atomic under
+    the GIL) and reads `steps_last`.
+    """
+
+    def __init__(self, sim: GravitySim):
+        super().__init__(daemon=True)
+        self.sim = sim
+        self.running = True
+        self.viewport = None
+        self.steps_last = 0
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        sim = self.sim
+        fixed_dt = 1.0 / PHYSICS_HZ
+        max_steps = int(0.25 / fixed_dt)
+        accumulator = 0.0
+        last = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            dt_real = now - last
+            last = now
+            if sim.paused:
+                accumulator = 0.0
+                self.steps_last = 0
             else:
-                # wells
-                for w in self.wells:
-                    dx = w.pos.x - p.pos.x; dy = w.pos.y - p.pos.y
-                    r2 = dx*dx + dy*dy + SOFTENING2
-                    inv_r = 1.0 / math.sqrt(r2); inv_r3 = inv_r * inv_r * inv_r
-                    a = G_CONST * w.mass * inv_r3
-                    ax += a*dx; ay += a*dy
-                # particle-particle only if small N
-                if len(self.particles) <= 700:
-                    for q in self.particles:
-                        if q is p: continue
-                        dx = q.pos.x - p.pos.x; dy = q.pos.y - p.pos.y
-                        r2 = dx*dx + dy*dy + SOFTENING2
-                        inv_r = 1.0 / math.sqrt(r2); inv_r3 = inv_r * inv_r * inv_r
-                        a = G_CONST * q.mass * inv_r3
-                        ax += a*dx; ay += a*dy
-
-            p.vel.x += ax * dt; p.vel.y += ay * dt
-            sp = p.vel.length()
-            if sp > PARTICLE_MAX_SPEED:
-                p.vel.scale_to_length(PARTICLE_MAX_SPEED)
-            p.pos += p.vel * dt
+                accumulator = min(accumulator + dt_real * sim.time_scale, 0.25)
+                steps = 0
+                while accumulator >= fixed_dt and steps < max_steps:
+                    with sim.lock:
+                        sim.step(fixed_dt, self.viewport)
+                    accumulator -= fixed_dt; steps += 1
+                if steps:
+                    with sim.lock:
+                        sim.publish_snapshot()
+                self.steps_last = steps
+            # sleep off the remainder of the physics period
+            sleep_for = fixed_dt - (time.perf_counter() - now)
+            if sleep_for > 0:
+                time.sleep(sleep_for)
 
 # =========================
 # Fancy spawners
 # =========================
-def spawn_ring(sim: GravitySim, center: pygame.Vector2, n=1000, radius=280, speed=220):
-    for i in range(n):
-        ang = (i / n) * math.tau
-        pos = center + pygame.Vector2(radius * math.cos(ang), radius * math.sin(ang))
-        tangent = pygame.Vector2(-math.sin(ang), math.cos(ang))
-        vel = tangent * (speed * (0.85 + 0.3 * random.random()))
-        sim.add_particle(pos, vel)
-
-def spawn_spiral(sim: GravitySim, center: pygame.Vector2, arms=3, per_arm=500, base_speed=210):
+def spawn_ring(sim: GravitySim, center: Tuple[float, float], n=1000, radius=280, speed=220):
+    ang = np.arange(n) * (math.tau / n)
+    c, s = np.cos(ang), np.sin(ang)
+    speeds = speed * (0.85 + 0.3 * sim.rng.random(n))
+    sim.add_particles_bulk(center[0] + radius * c, center[1] + radius * s,
+                           -s * speeds, c * speeds)
+
+def spawn_spiral(sim: GravitySim, center: Tuple[float, float], arms=3, per_arm=500, base_speed=210):
+    i = np.arange(per_arm)
+    r = 6 + i * 2.6
+    for a in range(arms):   # tiny outer loop; all per-particle math is vectorized
+        ang = a * (math.tau / arms) + i * 0.07
+        c, s = np.cos(ang), np.sin(ang)
+        speeds = base_speed * (0.8 + 0.4 * sim.rng.random(per_arm))
+        sim.add_particles_bulk(center[0] + r * c, center[1] + r * s,
+                               -s * speeds, c * speeds)
+
+def spawn_galaxy(sim: GravitySim, center: Tuple[float, float], arms=2, per_arm=2500, dispersion=22, speed=230):
+    i = np.arange(per_arm)
+    r = 10 + i * 1.2
     for a in range(arms):
-        base_ang = a * (math.tau / arms)
-        for i in range(per_arm):
-            r = 6 + i * 2.6
-            ang = base_ang + i * 0.07
-            pos = center + pygame.Vector2(r * math.cos(ang), r * math.sin(ang))
-            tangent = pygame.Vector2(-math.sin(ang), math.cos(ang))
-            vel = tangent * (base_speed * (0.8 + 0.4 * random.random()))
-            sim.add_particle(pos, vel)
-
-def spawn_galaxy(sim: GravitySim, center: pygame.Vector2, arms=2, per_arm=2500, dispersion=22, speed=230):
-    for a in range(arms):
-        base_ang = a * (math.tau / arms)
-        for i in range(per_arm):
-            r = 10 + i * 1.2
-            jitter = pygame.Vector2(random.uniform(-dispersion, dispersion),
-                                    random.uniform(-dispersion, dispersion))
-            ang = base_ang + i * 0.045 + random.uniform(-0.05, 0.05)
-            pos = center + pygame.Vector2(r * math.cos(ang), r * math.sin(ang)) + jitter
-            tangent = pygame.Vector2(-math.sin(ang), math.cos(ang))
-            vel = tangent * (speed * (0.85 + 0.3 * random.random()))
-            sim.add_particle(pos, vel)
-
-def spawn_cloud(sim: GravitySim, center: pygame.Vector2, count=3000, spread=(420, 300), max_speed=260):
-    for _ in range(count):
-        pos = center + pygame.Vector2(random.uniform(-spread[0], spread[0]),
-                                      random.uniform(-spread[1], spread[1]))
-        vel = pygame.Vector2(random.uniform(-max_speed, max_speed),
-                             random.uniform(-max_speed, max_speed)) * 0.35
-        sim.add_particle(pos, vel)
+        ang = a * (math.tau / arms) + i * 0.045 + sim.rng.uniform(-0.05, 0.05, per_arm)
+        c, s = np.cos(ang), np.sin(ang)
+        speeds = speed * (0.85 + 0.3 * sim.rng.random(per_arm))
+        sim.add_particles_bulk(center[0] + r * c + sim.rng.uniform(-dispersion, dispersion, per_arm),
+                               center[1] + r * s + sim.rng.uniform(-dispersion, dispersion, per_arm),
+                               -s * speeds, c * speeds)
+
+def spawn_cloud(sim: GravitySim, center: Tuple[float, float], count=3000, spread=(420, 300), max_speed=260):
+    sim.add_particles_bulk(center[0] + sim.rng.uniform(-spread[0], spread[0], count),
+                           center[1] + sim.rng.uniform(-spread[1], spread[1], count),
+                           sim.rng.uniform(-max_speed, max_speed, count) * 0.35,
+                           sim.rng.uniform(-max_speed, max_speed, count) * 0.35)
 
 # =========================
 # Rendering
@@ -374,15 +730,45 @@ def speed_color(speed: float, palette: int = 0):
             r = 255; g = int(0*(1-u) + 255*u); b = 255
         return (r, g, b)
 
-def draw_well_glow(surf: pygame.Surface, cam: Camera, w: Well):
-    c = cam.world_to_screen(w.pos)
-    pygame.draw.circle(surf, WELL_COLOR, (int(c.x), int(c.y)), max(2, int(w.radius * cam.zoom)))
-    max_r = int(110 * cam.zoom)
-    for r in (max_r, int(max_r*0.55), int(max_r*0.25)):
-        alpha = max(12, int(130 * (r / max_r) ** 1.15))
-        glow = pygame.Surface((r*2+1, r*2+1), pygame.SRCALPHA)
-        pygame.draw.circle(glow, (*WELL_COLOR, alpha), (r, r), r)
-        surf.blit(glow, (c.x - r, c.y - r), special_flags=pygame.BLEND_PREMULTIPLIED)
+# 256x3 uint8 LUTs over the 0..800 speed range, one per palette, built once
+# at import — indexing these replaces per-particle speed_color() calls.
+PALETTES = [
+    np.array([speed_color(s, p) for s in np.linspace(0.0, 800.0, 256)], dtype=np.uint8)
+    for p in (0, 1)
+]
+
+# HUD lines repeat verbatim for many frames (stats change ~once a second),
+# so rasterized text surfaces are cached by their exact string
+_HUD_CACHE = {}
+
+def _hud_text(font, line: str) -> pygame.Surface:
+    text = _HUD_CACHE.get(line)
+    if text is None:
+        if len(_HUD_CACHE) >= 64:
+            _HUD_CACHE.pop(next(iter(_HUD_CACHE)))
+        text = _HUD_CACHE.setdefault(line, font.render(line, True, HUD_COLOR))
+    return text
+
+# glow surfaces per quantized radius — rebuilding them per well per frame
+# allocated three SDL surfaces every call for an identical result
+_GLOW_CACHE = {}
+
+def draw_well_glow(surf: pygame.Surface, cam: Camera, wx: float, wy: float, wradius: float):
+    cx, cy = cam.world_to_screen(float(wx), float(wy))
+    pygame.draw.circle(surf, WELL_COLOR, (int(cx), int(cy)), max(2, int(wradius * cam.zoom)))
+    max_r = max(4, (int(110 * cam.zoom) // 4) * 4)   # 4px buckets keep the cache small
+    glow = _GLOW_CACHE.get(max_r)
+    if glow is None:
+        glow = pygame.Surface((max_r*2+1, max_r*2+1), pygame.SRCALPHA)
+        for r in (max_r, int(max_r*0.55), int(max_r*0.25)):
+            alpha = max(12, int(130 * (r / max_r) ** 1.15))
+            ring = pygame.Surface((r*2+1, r*2+1), pygame.SRCALPHA)
+            pygame.draw.circle(ring, (*WELL_COLOR, alpha), (r, r), r)
+            glow.blit(ring, (max_r - r, max_r - r), special_flags=pygame.BLEND_PREMULTIPLIED)
+        if len(_GLOW_CACHE) >= 128:
+            _GLOW_CACHE.pop(next(iter(_GLOW_CACHE)))
+        _GLOW_CACHE[max_r] = glow
+    surf.blit(glow, (cx - max_r, cy - max_r), special_flags=pygame.BLEND_PREMULTIPLIED)
 
 def draw(sim: GravitySim, screen: pygame.Surface, trail_layer: pygame.Surface,
          cam: Camera, font, small, palette_idx, launch_start, launch_end,
@@ -395,21 +781,32 @@ def draw(sim: GravitySim, screen: pygame.Surface, trail_layer: pygame.Surface,
         trail_layer.fill((0, 0, 0, 255))
         canvas = trail_layer
 
-    # particles
-    put = pygame.Surface((2, 2), pygame.SRCALPHA); put.fill((255,255,255,255))
-    for p in sim.particles:
-        sp = cam.world_to_screen(p.pos)
-        if -2 <= sp.x <= WIDTH+2 and -2 <= sp.y <= HEIGHT+2:
-            col = speed_color(p.vel.length(), palette_idx)
-            put.fill((*col, 255))
-            canvas.blit(put, (sp.x, sp.y))
+    # particles: one scatter into the pixel buffer instead of N blits;
+    # positions come from the physics thread's last published snapshot
+    px, py, vx, vy = sim.snapshot()
+    if len(px):
+        sx = ((px - cam.ox) * cam.zoom).astype(np.int32)
+        sy = ((py - cam.oy) * cam.zoom).astype(np.int32)
+        on = (sx >= 0) & (sx < WIDTH - 1) & (sy >= 0) & (sy < HEIGHT - 1)
+        sx, sy = sx[on], sy[on]
+        speed = np.hypot(vx[on], vy[on])
+        cols = PALETTES[palette_idx][np.minimum((speed * (255.0 / 800.0)).astype(np.int32), 255)]
+        arr = pygame.surfarray.pixels3d(canvas)
+        # 2x2 dots, like the old blit of a 2x2 put surface
+        arr[sx, sy] = cols; arr[sx + 1, sy] = cols
+        arr[sx, sy + 1] = cols; arr[sx + 1, sy + 1] = cols
+        del arr
+        alpha = pygame.surfarray.pixels_alpha(canvas)
+        alpha[sx, sy] = 255; alpha[sx + 1, sy] = 255
+        alpha[sx, sy + 1] = 255; alpha[sx + 1, sy + 1] = 255
+        del alpha
 
     # compose trails
     screen.blit(trail_layer, (0, 0))
 
     # wells & effects
-    for w in sim.wells:
-        draw_well_glow(screen, cam, w)
+    for j in range(sim.n_wells):
+        draw_well_glow(screen, cam, sim.wx[j], sim.wy[j], sim.wradius[j])
 
     # launch vector preview
     if launch_start and launch_end:
@@ -421,8 +818,8 @@ def draw(sim: GravitySim, screen: pygame.Surface, trail_layer: pygame.Surface,
         lines = []
         if sim.show_stats:
             lines += [
-                f"Particles: {len(sim.particles):,} / {MAX_PARTICLES:,}    Wells: {len(sim.wells)}",
-                f"Render: {fps:5.1f} fps  Physics: {PHYSICS_HZ:.0f} Hz  Steps/frame: {steps_last}",
+                f"Particles: {sim.n:,} / {MAX_PARTICLES:,}    Wells: {sim.n_wells}",
+                f"Render: {fps:5.0f} fps  Physics: {PHYSICS_HZ:.0f} Hz  Steps/frame: {steps_last}",
                 f"Time x{sim.time_scale:.2f}    Trails: {'on' if sim.trails else 'off'}",
                 f"Barnes–Hut: {'on' if sim.barnes_hut else 'off'}  θ={sim.theta:.2f}",
             ]
@@ -434,22 +831,21 @@ def draw(sim: GravitySim, screen: pygame.Surface, trail_layer: pygame.Surface,
             ]
         y = 10
         for line in lines:
-            text = font.render(line, True, HUD_COLOR); screen.blit(text, (10, y)); y += text.get_height() + 2
+            text = _hud_text(font, line); screen.blit(text, (10, y)); y += text.get_height() + 2
 
 # =========================
 # Save/Load
 # =========================
 def save_sim(sim: GravitySim, path: pathlib.Path):
-    data = {
-        "wells": [{"x": float(w.pos.x), "y": float(w.pos.y), "mass": float(w.mass)} for w in sim.wells],
-        "particles": [{"x": float(p.pos.x), "y": float(p.pos.y),
-                       "vx": float(p.vel.x), "vy": float(p.vel.y)} for p in sim.particles],
-        "time_scale": sim.time_scale, "theta": sim.theta, "barnes_hut": sim.barnes_hut,
-    }
-    path.write_text(json.dumps(data))
-
-def load_sim(sim: GravitySim, path: pathlib.Path):
-    if not path.exists(): return False
+    # SoA arrays go straight to a compressed NumPy archive — no per-particle
+    # Python dicts, ~10x smaller on disk than the old JSON
+    n = sim.n
+    np.savez_compressed(path, px=sim.px[:n], py=sim.py[:n], vx=sim.vx[:n], vy=sim.vy[:n],
+                        wx=sim.wx, wy=sim.wy, wmass=sim.wmass, wradius=sim.wradius,
+                        meta=np.array([sim.time_scale, sim.theta, float(sim.barnes_hut)]))
+
+def _load_sim_json(sim: GravitySim, path: pathlib.Path):
+    # legacy format from before the .npz switch
     data = json.loads(path.read_text())
     sim.clear_all()
     for w in data.get("wells", []):
@@ -461,6 +857,25 @@ def load_sim(sim: GravitySim, path: pathlib.Path):
     sim.barnes_hut = bool(data.get("barnes_hut", True))
     return True
 
+def load_sim(sim: GravitySim, path: pathlib.Path):
+    if not path.exists():
+        legacy = path.with_suffix(".json")
+        if legacy.exists():
+            return _load_sim_json(sim, legacy)
+        return False
+    with np.load(path) as data:
+        sim.clear_all()
+        sim.wx = data["wx"].astype(np.float32)
+        sim.wy = data["wy"].astype(np.float32)
+        sim.wmass = data["wmass"].astype(np.float32)
+        sim.wradius = data["wradius"].astype(np.float32)
+        sim.add_particles_bulk(data["px"], data["py"], data["vx"], data["vy"])
+        meta = data["meta"]
+    sim.time_scale = float(meta[0])
+    sim.theta = float(meta[1])
+    sim.barnes_hut = bool(meta[2])
+    return True
+
 # =========================
 # Main
 # =========================
@@ -482,25 +897,24 @@ def main():
 
     # initial setup: twin wells + ring
     center = cam.screen_to_world((WIDTH//2, HEIGHT//2))
-    sim.add_well(center + pygame.Vector2(-200, 0))
-    sim.add_well(center + pygame.Vector2(200, 0))
+    sim.add_well((center[0] - 200, center[1]))
+    sim.add_well((center[0] + 200, center[1]))
     spawn_ring(sim, center, n=DEFAULT_PARTICLES, radius=280, speed=220)
 
     running = True
     dragging_left = False
     dragging_mid = False
-    pan_start = pygame.Vector2(0, 0)
-    cam_start = pygame.Vector2(0, 0)
+    pan_start = (0, 0)
+    cam_start = (0.0, 0.0)
     launch_start = None
     launch_end = None
 
-    fixed_dt = 1.0 / PHYSICS_HZ
-    accumulator = 0.0
-    steps_last = 0
+    physics = PhysicsThread(sim)
+    physics.start()
     fps = 0.0
 
     screenshot_dir = pathlib.Path("./screenshots"); screenshot_dir.mkdir(exist_ok=True)
-    state_path = pathlib.Path("./gravity_state.json")
+    state_path = pathlib.Path("./gravity_state.npz")
 
     while running:
         dt_real = clock.tick(RENDER_HZ) / 1000.0
@@ -516,7 +930,7 @@ def main():
                     launch_start = event.pos; launch_end = event.pos
                 elif event.button == 2:
                     dragging_mid = True
-                    pan_start = pygame.Vector2(event.pos); cam_start = pygame.Vector2(cam._target_offset)
+                    pan_start = event.pos; cam_start = (cam.tox, cam.toy)
                 elif event.button == 3:
                     mods = pygame.key.get_mods()
                     pos_world = cam.screen_to_world(event.pos)
@@ -531,10 +945,9 @@ def main():
                 if event.button == 1 and dragging_left:
                     dragging_left = False
                     if launch_start and launch_end:
-                        p0 = cam.screen_to_world(launch_start)
-                        p1 = cam.screen_to_world(launch_end)
-                        v = (p1 - p0) * 2.0
-                        sim.add_particle(p0, v)
+                        x0, y0 = cam.screen_to_world(launch_start)
+                        x1, y1 = cam.screen_to_world(launch_end)
+                        sim.add_particle((x0, y0), ((x1 - x0) * 2.0, (y1 - y0) * 2.0))
                     launch_start = None; launch_end = None
                 elif event.button == 2:
                     dragging_mid = False
@@ -544,7 +957,9 @@ def main():
                     launch_end = event.pos
                 keys = pygame.key.get_pressed()
                 if dragging_mid or keys[pygame.K_SPACE]:
-                    cam._target_offset = cam_start - ( (pygame.Vector2(event.pos) - pan_start) / cam.zoom )
+                    ex, ey = event.pos
+                    cam.tox = cam_start[0] - (ex - pan_start[0]) / cam.zoom
+                    cam.toy = cam_start[1] - (ey - pan_start[1]) / cam.zoom
 
             elif event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_p, pygame.K_SPACE): sim.paused = not sim.paused
@@ -560,8 +975,8 @@ def main():
                 elif event.key == pygame.K_r:
                     sim.clear_all(); cam = Camera()
                     center = cam.screen_to_world((WIDTH//2, HEIGHT//2))
-                    sim.add_well(center + pygame.Vector2(-220, 0))
-                    sim.add_well(center + pygame.Vector2(220, 0))
+                    sim.add_well((center[0] - 220, center[1]))
+                    sim.add_well((center[0] + 220, center[1]))
                     spawn_ring(sim, center, n=DEFAULT_PARTICLES, radius=300, speed=220)
                 elif event.key == pygame.K_1:
                     center = cam.screen_to_world((WIDTH//2, HEIGHT//2)); spawn_ring(sim, center, n=2000, radius=300, speed=220)
@@ -577,7 +992,9 @@ def main():
                     sim.add_well(pos)
                     spawn_ring(sim, pos, n=1200, radius=240, speed=220)
                 elif event.key == pygame.K_k:
-                    sim.seed = (sim.seed + 1) & 0xffffffff; random.seed(sim.seed)
+                    sim.seed = (sim.seed + 1) & 0xffffffff
+                    random.seed(sim.seed)
+                    sim.rng = np.random.default_rng(sim.seed)
                 elif event.key == pygame.K_s:
                     save_sim(sim, state_path)
                 elif event.key == pygame.K_l:
@@ -588,15 +1005,11 @@ def main():
                     pygame.image.save(screen, str(path))
                     print(f"Saved screenshot to {path.resolve()}")
 
-        # physics (fixed step w/ accumulator)
-        if not sim.paused:
-            accumulator += dt_real * sim.time_scale
-            steps = 0
-            max_steps = int(0.25 / fixed_dt)
-            while accumulator >= fixed_dt and steps < max_steps:
-                sim.step(fixed_dt)
-                accumulator -= fixed_dt; steps += 1
-            steps_last = steps
+        # physics runs on its own thread; just hand it the current viewport
+        inv_zoom = 1.0 / cam.zoom
+        physics.viewport = (cam.ox, cam.oy,
+                            cam.ox + WIDTH * inv_zoom, cam.oy + HEIGHT * inv_zoom)
+        steps_last = physics.steps_last
 
         cam.update(dt_real)
 
@@ -605,6 +1018,8 @@ def main():
         draw(sim, screen, trail_layer, cam, font, small, palette_idx, launch_start, launch_end, fps, steps_last, dt_real)
         pygame.display.flip()
 
+    physics.stop()
+    physics.join(timeout=1.0)
     pygame.quit()
 
 # -------------
@@ -14,8 +14,8 @@ pygame.display.set_caption('Rotating Cube')
 # Set up the colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
-# Define cube vertices
-vertices = [
+# Define cube vertices (one array, transformed in a single matmul per frame)
+vertices = np.array([
     [-1, -1, -1],
     [-1, -1, 1],
     [-1, 1, -1],
@@ -24,7 +24,7 @@ vertices = [
     [1, -1, 1],
     [1, 1, -1],
     [1, 1, 1]
-]
+], dtype=np.float32)
 # Define cube edges
 edges = [
     (0, 1),
@@ -68,26 +68,18 @@ while True:
         [np.sin(angle_z), np.cos(angle_z), 0],
         [0, 0, 1]
     ])
-    # Apply rotation matrices to vertices
-    rotated_vertices = []
-    for vertex in vertices:
-        rotated_vertex = vertex.copy()
-        rotated_vertex = np.dot(rotation_x, rotated_vertex)
-        rotated_vertex = np.dot(rotation_y, rotated_vertex)
-        rotated_vertex = np.dot(rotation_z, rotated_vertex)
-        rotated_vertices.append(rotated_vertex)
-    # Project vertices onto 2D screen
-    projected_vertices = []
-    for vertex in rotated_vertices:
-        z = 1 / (vertex[2] + 3)
-        projected_vertex = [vertex[0] * z, vertex[1] * z]
-        projected_vertices.append(projected_vertex)
+    # Compose the rotations once and apply to all vertices in one matmul
+    rotation = rotation_z @ rotation_y @ rotation_x
+    rotated_vertices = vertices @ rotation.T
+    # Project vertices onto 2D screen (vectorized)
+    z = 1 / (rotated_vertices[:, 2] + 3)
+    projected_vertices = rotated_vertices[:, :2] * z[:, None]
+    screen_vertices = projected_vertices * 100 + (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
     # Draw edges
     for edge in edges:
-        start_pos = projected_vertices[edge[0]]
-        end_pos = projected_vertices[edge[1]]
-        pygame.draw.line(window, WHITE, (start_pos[0] * 100 + WINDOW_WIDTH // 2, start_pos[1] * 100 + WINDOW_HEIGHT // 2),
-                         (end_pos[0] * 100 + WINDOW_WIDTH // 2, end_pos[1] * 100 + WINDOW_HEIGHT // 2))
+        start_pos = screen_vertices[edge[0]]
+        end_pos = screen_vertices[edge[1]]
+        pygame.draw.line(window, WHITE, start_pos, end_pos)
     # Update rotation angles
     angle_x += 0.01
     angle_y += 0.01
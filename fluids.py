@@ -1,7 +1,33 @@
 #This projects presents a simple python fluid simulation.
 import pygame
-import random
 import math
+from collections import deque
+import numpy as np
+
+try:
+    from numba import njit, prange, get_num_threads, get_thread_id
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+    def get_num_threads(): return 1
+    def get_thread_id(): return 0
+
+# Compiled Cython kernel (built via setup_fluids_c.py) as the next rung
+# down when numba is missing; the NumPy path below remains the last resort
+HAVE_CYTHON = False
+if not HAVE_NUMBA:
+    try:
+        from _fluids_c import pairwise_step
+        HAVE_CYTHON = True
+    except ImportError:
+        pass
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+    HAVE_SDL2_VIDEO = True
+except ImportError:
+    HAVE_SDL2_VIDEO = False
 
 # Initialize pygame
 pygame.init()
@@ -21,105 +47,445 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 PURPLE = (128, 0, 128)
 
-# Particle class
-class Particle:
-    def __init__(self):
-        self.x = random.uniform(0, WIDTH)
-        self.y = random.uniform(0, HEIGHT)
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
-        self.radius = random.randint(2, 5)
-        self.color = random.choice([WHITE, CYAN, BLUE, MAGENTA, YELLOW, ORANGE, GREEN, RED, PURPLE])
-        self.opacity = random.randint(50, 255)
-
-    def move(self):
-        self.x += self.vx
-        self.y += self.vy
-
-        # Bounce off walls
-        if self.x <= 0 or self.x >= WIDTH:
-            self.vx *= -1
-        if self.y <= 0 or self.y >= HEIGHT:
-            self.vy *= -1
-
-    def draw(self, screen):
-        surface = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(surface, (*self.color, self.opacity), (self.radius, self.radius), self.radius)
-        screen.blit(surface, (self.x - self.radius, self.y - self.radius))
-
-# Create particles with interactivity
-class InteractiveParticle(Particle):
-    def __init__(self):
-        super().__init__()
-        self.attraction_strength = random.uniform(0.05, 0.1)
-
-    def attract(self, mx, my):
-        dx = mx - self.x
-        dy = my - self.y
-        distance = math.sqrt(dx ** 2 + dy ** 2)
-        if distance > 0:
-            self.vx += self.attraction_strength * (dx / distance)
-            self.vy += self.attraction_strength * (dy / distance)
-
-# Create trails for particles
-class ParticleTrail(InteractiveParticle):
-    def __init__(self):
-        super().__init__()
-        self.trail = []
-        self.max_trail_length = random.randint(10, 20)
-
-    def move(self):
-        super().move()
-        # Add current position to trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > self.max_trail_length:
-            self.trail.pop(0)
-
-    def draw(self, screen):
-        super().draw(screen)
-        for i in range(1, len(self.trail)):
-            start_pos = self.trail[i - 1]
-            end_pos = self.trail[i]
-            alpha = int((i / len(self.trail)) * 255)
-            color = (*self.color[:3], alpha)
-            pygame.draw.line(screen, color, start_pos, end_pos, 2)
-
-# Create particle interactions
-class ParticleInteraction(ParticleTrail):
-    def __init__(self):
-        super().__init__()
-        self.repulsion_strength = random.uniform(0.05, 0.1)
-        self.rotation_speed = random.uniform(0.01, 0.03)
-
-    def repel(self, other):
-        dx = other.x - self.x
-        dy = other.y - self.y
-        distance = math.sqrt(dx ** 2 + dy ** 2)
-        if 0 < distance < 50:  # Interaction range
-            force = self.repulsion_strength / distance
-            self.vx -= force * (dx / distance)
-            self.vy -= force * (dy / distance)
-
-    def swirl(self, mx, my):
-        dx = mx - self.x
-        dy = my - self.y
-        distance = math.sqrt(dx ** 2 + dy ** 2)
-        if distance > 0:
-            angle = math.atan2(dy, dx) + self.rotation_speed
-            self.vx += math.cos(angle) * 0.5
-            self.vy += math.sin(angle) * 0.5
-
-# Initialize screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Complex Fluid Simulation")
+# Palette indexed by color_idx below (the arrays store indices, not tuples)
+COLOR_LIST = [WHITE, CYAN, BLUE, MAGENTA, YELLOW, ORANGE, GREEN, RED, PURPLE]
+
+# Pairwise-loop tile width: a constant so LLVM sees a fixed inner trip count
+TILE = 64
+
+# Fused per-frame physics kernel: repulsion and the position/bounce update
+# in one compiled pass with O(N) scratch — no N x N temporaries like the
+# broadcast path. JIT'd when numba is importable; the same source runs as
+# plain Python otherwise (the NumPy path below is the real fallback, this
+# just keeps one definition). Mouse forces live in their own kernels below,
+# invoked only on frames where the button is actually down, so the hot
+# no-mouse frame carries no per-particle flag branches.
+def _step_kernel(x, y, vx, vy, repel_s, w, h):
+    n = x.shape[0]
+    # Newton's-third-law pass: each unordered pair is visited once
+    # (j > i) and both ends are updated, halving the pairwise work.
+    # Strengths are per-particle so the two ends scale the shared dx/d2
+    # by their own factor. Per-thread accumulator rows keep prange free
+    # of races on the j side; they're reduced in the second loop.
+    # The loop is blocked in TILE-sized i/j tiles with the j-tile staged
+    # into fixed-size local buffers, so the inner loop streams from L1
+    # with a compile-time trip count LLVM can unroll.
+    nt = get_num_threads()
+    axb = np.zeros((nt, n), dtype=np.float32)
+    ayb = np.zeros((nt, n), dtype=np.float32)
+    nblocks = (n + TILE - 1) // TILE
+    for bi in prange(nblocks):
+        t = get_thread_id()
+        ii = bi * TILE
+        imax = min(ii + TILE, n)
+        tx = np.empty(TILE, dtype=np.float32)
+        ty = np.empty(TILE, dtype=np.float32)
+        ts = np.empty(TILE, dtype=np.float32)
+        for jj in range(ii, n, TILE):
+            m = min(jj + TILE, n) - jj
+            for k in range(m):
+                tx[k] = x[jj + k]; ty[k] = y[jj + k]; ts[k] = repel_s[jj + k]
+            for i in range(ii, imax):
+                xi = x[i]; yi = y[i]; si = repel_s[i]
+                axi = np.float32(0.0)
+                ayi = np.float32(0.0)
+                # inside the diagonal tile only pairs with j > i remain
+                kstart = i - jj + 1 if jj == ii else 0
+                for k in range(kstart, m):
+                    dx = tx[k] - xi; dy = ty[k] - yi
+                    d2 = dx * dx + dy * dy
+                    if np.float32(0.0) < d2 < np.float32(2500.0):   # 50px interaction range
+                        inv = np.float32(1.0) / d2
+                        fi = si * inv
+                        fj = ts[k] * inv
+                        axi -= fi * dx; ayi -= fi * dy
+                        axb[t, jj + k] += fj * dx; ayb[t, jj + k] += fj * dy
+                axb[t, i] += axi; ayb[t, i] += ayi
+    for i in prange(n):
+        ax = np.float32(0.0)
+        ay = np.float32(0.0)
+        for t in range(nt):
+            ax += axb[t, i]
+            ay += ayb[t, i]
+        vx[i] += ax
+        vy[i] += ay
+    # separate pass so every position update sees fully-updated velocities
+    for i in prange(n):
+        x[i] += vx[i]
+        y[i] += vy[i]
+        # clamp along with the bounce: a velocity spike can carry a
+        # particle past the wall, where it would stick flipping sign
+        if x[i] <= np.float32(0.0) or x[i] >= w:
+            vx[i] = -vx[i]
+            x[i] = min(max(x[i], np.float32(0.0)), w)
+        if y[i] <= np.float32(0.0) or y[i] >= h:
+            vy[i] = -vy[i]
+            y[i] = min(max(y[i], np.float32(0.0)), h)
+
+# Uniform-grid variant: the interaction range is a hard 50px, so particles
+# are binned into 50px cells (CSR arrays built in NumPy each frame) and each
+# one only tests the 3x3 neighboring cells — O(N * density) instead of the
+# dense kernel's O(N^2/2). Forces are accumulated per-i only, so no
+# per-thread buffers are needed.
+GRID_CELL = 50.0
+GRID_COLS = (WIDTH + 49) // 50
+GRID_ROWS = (HEIGHT + 49) // 50
+GRID_MIN_N = 150              # below this the dense tiled kernel wins
+
+def _grid_step_kernel(x, y, vx, vy, cellx, celly, order, cell_start,
+                      repel_s, w, h):
+    n = x.shape[0]
+    for i in prange(n):
+        xi = x[i]; yi = y[i]; si = repel_s[i]
+        ax = np.float32(0.0)
+        ay = np.float32(0.0)
+        for dcy in range(-1, 2):
+            ccy = celly[i] + dcy
+            if ccy < 0 or ccy >= GRID_ROWS:
+                continue
+            for dcx in range(-1, 2):
+                ccx = cellx[i] + dcx
+                if ccx < 0 or ccx >= GRID_COLS:
+                    continue
+                c = ccy * GRID_COLS + ccx
+                for s in range(cell_start[c], cell_start[c + 1]):
+                    j = order[s]
+                    if j == i:
+                        continue
+                    dx = x[j] - xi; dy = y[j] - yi
+                    d2 = dx * dx + dy * dy
+                    if np.float32(0.0) < d2 < np.float32(2500.0):   # 50px interaction range
+                        f = si / d2
+                        ax -= f * dx
+                        ay -= f * dy
+        vx[i] += ax
+        vy[i] += ay
+    for i in prange(n):
+        x[i] += vx[i]
+        y[i] += vy[i]
+        # clamp along with the bounce: a velocity spike can carry a
+        # particle past the wall, where it would stick flipping sign
+        if x[i] <= np.float32(0.0) or x[i] >= w:
+            vx[i] = -vx[i]
+            x[i] = min(max(x[i], np.float32(0.0)), w)
+        if y[i] <= np.float32(0.0) or y[i] >= h:
+            vy[i] = -vy[i]
+            y[i] = min(max(y[i], np.float32(0.0)), h)
+
+def bin_particles(x, y):
+    # CSR cell->particle index arrays for the grid kernel
+    cellx = np.clip((x * (1.0 / GRID_CELL)).astype(np.int32), 0, GRID_COLS - 1)
+    celly = np.clip((y * (1.0 / GRID_CELL)).astype(np.int32), 0, GRID_ROWS - 1)
+    ids = celly * GRID_COLS + cellx
+    order = np.argsort(ids, kind='stable').astype(np.int32)
+    ncells = GRID_COLS * GRID_ROWS
+    cell_start = np.searchsorted(ids[order], np.arange(ncells + 1)).astype(np.int32)
+    return cellx, celly, order, cell_start
+
+# Mouse-force kernels, dispatched once per frame from the main loop based
+# on the button state instead of testing flags 400x inside the pairwise
+# kernels — the branchless kernels specialize cleanly.
+def _attract_kernel(x, y, vx, vy, mx, my, attract_s):
+    for i in prange(x.shape[0]):
+        dx = mx - x[i]; dy = my - y[i]
+        d = np.float32(math.sqrt(dx * dx + dy * dy))
+        if d > np.float32(0.0):
+            vx[i] += attract_s[i] * (dx / d)
+            vy[i] += attract_s[i] * (dy / d)
+
+def _swirl_kernel(x, y, vx, vy, mx, my, rot_s):
+    for i in prange(x.shape[0]):
+        dx = mx - x[i]; dy = my - y[i]
+        d = np.float32(math.sqrt(dx * dx + dy * dy))
+        if d > np.float32(0.0):
+            ang = math.atan2(dy, dx) + rot_s[i]
+            vx[i] += np.float32(math.cos(ang) * 0.5)
+            vy[i] += np.float32(math.sin(ang) * 0.5)
+
+if HAVE_NUMBA:
+    # no cache=True on the dense kernel: get_num_threads/get_thread_id are
+    # dynamic globals, which numba refuses to persist to the on-disk cache
+    step_kernel = njit(parallel=True, fastmath=True,
+                       error_model='numpy')(_step_kernel)
+    grid_step_kernel = njit(parallel=True, fastmath=True, cache=True,
+                            error_model='numpy')(_grid_step_kernel)
+    attract_kernel = njit(parallel=True, fastmath=True, cache=True,
+                          error_model='numpy')(_attract_kernel)
+    swirl_kernel = njit(parallel=True, fastmath=True, cache=True,
+                        error_model='numpy')(_swirl_kernel)
+else:
+    step_kernel = _step_kernel
+    grid_step_kernel = _grid_step_kernel
+    attract_kernel = _attract_kernel
+    swirl_kernel = _swirl_kernel
+
+# Cached circle sprites keyed by (radius, color_idx, alpha bucket).
+# Particle attributes never change after init, so each distinct combination
+# is rasterized and converted once instead of allocating and re-rendering a
+# fresh SRCALPHA surface per particle per frame. Opacity is quantized to 16
+# levels at init, which bounds the cache at 4 radii x 9 colors x 16 alphas.
+SPRITE_CACHE = {}
+
+def get_sprite(r, color_idx, opacity):
+    key = (r, color_idx, opacity >> 4)
+    sprite = SPRITE_CACHE.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*COLOR_LIST[color_idx], opacity), (r, r), r)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        SPRITE_CACHE[key] = sprite
+    return sprite
+
+# GPU textures for the Renderer path. Alpha is modulated per draw via
+# Texture.alpha instead of being baked into the pixels, so the cache only
+# needs one opaque texture per (radius, color) -- 36 in all.
+TEXTURE_CACHE = {}
+
+def get_texture(renderer, r, color_idx):
+    key = (r, color_idx)
+    tex = TEXTURE_CACHE.get(key)
+    if tex is None:
+        # rasterize the opaque source directly: the sprite cache buckets
+        # alpha (255 lands in the 240 bucket), so going through it could
+        # return an alpha-baked surface and double-apply alpha once
+        # Texture.alpha modulates on top
+        sprite = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*COLOR_LIST[color_idx], 255), (r, r), r)
+        tex = Texture.from_surface(renderer, sprite)
+        TEXTURE_CACHE[key] = tex
+    return tex
+
+# Particle container: state lives in parallel NumPy arrays (struct-of-arrays)
+# so the O(N^2) repulsion runs as one broadcast expression instead of ~160k
+# per-pair Python method calls per frame.
+class Particles:
+    def __init__(self, n):
+        self.n = n
+        # One vectorized draw per field instead of ~10 Python-level
+        # random.* calls per particle at startup
+        rng = np.random.default_rng()
+        self.x = rng.uniform(0, WIDTH, n).astype(np.float32)
+        self.y = rng.uniform(0, HEIGHT, n).astype(np.float32)
+        self.vx = rng.uniform(-2, 2, n).astype(np.float32)
+        self.vy = rng.uniform(-2, 2, n).astype(np.float32)
+        self.radius = rng.integers(2, 6, n, dtype=np.int32)
+        self.color_idx = rng.integers(0, len(COLOR_LIST), n, dtype=np.int32)
+        # quantized to 16 alpha levels: visually indistinguishable and it
+        # bounds the sprite/texture caches (see get_sprite/get_texture)
+        self.opacity = (rng.integers(50, 256, n, dtype=np.int32) >> 4) << 4
+        self.attraction_strength = rng.uniform(0.05, 0.1, n).astype(np.float32)
+        self.repulsion_strength = rng.uniform(0.05, 0.1, n).astype(np.float32)
+        self.rotation_speed = rng.uniform(0.01, 0.03, n).astype(np.float32)
+        # Trails stay as per-particle position histories; deque(maxlen=...)
+        # evicts the oldest point in O(1) where list.pop(0) shifted the
+        # whole buffer every frame
+        trail_caps = rng.integers(10, 21, n)
+        self.trails = [deque(maxlen=int(trail_caps[i])) for i in range(n)]
+        # Attributes are fixed at init, so resolve the per-particle sprite,
+        # radius int and trail RGBA once here instead of rebuilding key and
+        # color tuples every frame in draw()
+        self.r_int = [int(r) for r in self.radius]
+        self.sprites = [get_sprite(self.r_int[i], int(self.color_idx[i]),
+                                   int(self.opacity[i])) for i in range(n)]
+        self.op_int = [int(o) for o in self.opacity]
+        self.textures = None
+        if USE_RENDERER:
+            self.textures = [get_texture(renderer, self.r_int[i],
+                                         int(self.color_idx[i])) for i in range(n)]
+        # Trail drawing is batched per color bucket, so group particle
+        # indices by color once here
+        self.color_groups = [np.nonzero(self.color_idx == c)[0]
+                             for c in range(len(COLOR_LIST))]
+        # On the renderer path, radius <= 2 bodies degrade to single
+        # points (indistinguishable at this resolution); bucket their
+        # indices by (color, alpha) once so the draw color is set per
+        # bucket, and keep a mask selecting the textured rest
+        small = self.radius <= 2
+        self.point_groups = {}
+        for i in np.nonzero(small)[0]:
+            key = (int(self.color_idx[i]), int(self.opacity[i]))
+            self.point_groups.setdefault(key, []).append(int(i))
+        self.big_mask = ~small
+        # Scratch for repel_all's pairwise matrices, allocated once: the
+        # broadcast path otherwise churns ~6 MB of fresh N x N temporaries
+        # through the allocator every frame
+        self._dx = np.empty((n, n), dtype=np.float32)
+        self._dy = np.empty((n, n), dtype=np.float32)
+        self._d2 = np.empty((n, n), dtype=np.float32)
+        self._f = np.empty((n, n), dtype=np.float32)
+        self._mask = np.empty((n, n), dtype=np.bool_)
+        self._near = np.empty((n, n), dtype=np.bool_)
+        self._row = np.empty(n, dtype=np.float32)
+
+
+# Per-particle behavior lives in free functions over the SoA container
+# rather than methods: the class carries only data, matching the numba
+# kernels above and keeping the numpy fallback path data-oriented too.
+def attract(p, mx, my):
+    # one pass of ufuncs over the whole array instead of N math.sqrt calls
+    dx = mx - p.x
+    dy = my - p.y
+    d = np.hypot(dx, dy)
+    f = np.where(d > 0, p.attraction_strength / np.maximum(d, 1e-12), 0.0)
+    p.vx += f * dx
+    p.vy += f * dy
+
+def swirl(p, mx, my):
+    dx = mx - p.x
+    dy = my - p.y
+    d = np.hypot(dx, dy)
+    angle = np.arctan2(dy, dx) + p.rotation_speed
+    p.vx += np.where(d > 0, np.cos(angle) * 0.5, 0.0)
+    p.vy += np.where(d > 0, np.sin(angle) * 0.5, 0.0)
+
+def repel_all(p):
+    # Pairwise repulsion as one broadcast: dx[i, j] = x[j] - x[i]
+    # (other minus p, matching the old repel()); the contribution is
+    # strength/d * dx/d = strength * dx / d2, so no sqrt is needed.
+    # Every op writes into the preallocated scratch (out=), keeping the
+    # matrices hot in cache instead of malloc/freeing them per frame.
+    x, y = p.x, p.y
+    dx, dy, d2, f = p._dx, p._dy, p._d2, p._f
+    np.subtract(x[None, :], x[:, None], out=dx)
+    np.subtract(y[None, :], y[:, None], out=dy)
+    np.multiply(dx, dx, out=d2)
+    np.multiply(dy, dy, out=f)
+    d2 += f
+    np.fill_diagonal(d2, np.inf)   # no p-interaction
+    np.less(d2, 2500.0, out=p._mask)    # 50px interaction range
+    np.greater(d2, 0.0, out=p._near)
+    np.logical_and(p._mask, p._near, out=p._mask)
+    f[:] = 0.0
+    np.divide(1.0, d2, out=f, where=p._mask)
+    np.multiply(f, dx, out=d2)     # d2 reused as a product buffer
+    d2.sum(axis=1, out=p._row)
+    p._row *= p.repulsion_strength
+    p.vx -= p._row
+    np.multiply(f, dy, out=d2)
+    d2.sum(axis=1, out=p._row)
+    p._row *= p.repulsion_strength
+    p.vy -= p._row
+
+def move(p):
+    p.x += p.vx
+    p.y += p.vy
+    # Bounce off walls in place (no np.where temporaries). The clip pulls
+    # anything a velocity spike pushed past a wall back inside; it used to
+    # stay out there with its velocity flipping sign every frame.
+    np.negative(p.vx, out=p.vx, where=(p.x <= 0) | (p.x >= WIDTH))
+    np.negative(p.vy, out=p.vy, where=(p.y <= 0) | (p.y >= HEIGHT))
+    np.clip(p.x, 0, WIDTH, out=p.x)
+    np.clip(p.y, 0, HEIGHT, out=p.y)
+
+def record_trails(p):
+    # Add current positions to trails (shared by both physics paths);
+    # maxlen makes the length cap automatic. Unmoved particles would
+    # append a duplicate point and cost SDL a zero-length segment, so
+    # those are skipped.
+    for i in range(p.n):
+        trail = p.trails[i]
+        pos = (float(p.x[i]), float(p.y[i]))
+        if not trail or trail[-1] != pos:
+            trail.append(pos)
+
+def draw(p, screen, interp=0.0):
+    # bodies: one batched fblits of cached sprites instead of N blits;
+    # a cheap vectorized mask prefilters anything fully off-screen (a
+    # velocity spike can push a particle past the walls for a frame).
+    # interp extrapolates between 30 Hz physics states so the 60 Hz
+    # render stays smooth (positions advance by vx per physics step).
+    px = p.x + p.vx * interp
+    py = p.y + p.vy * interp
+    visible = np.nonzero((px > -6) & (px < WIDTH + 6) &
+                         (py > -6) & (py < HEIGHT + 6))[0]
+    blit_seq = []
+    for i in visible:
+        r = p.r_int[i]
+        blit_seq.append((p.sprites[i], (float(px[i]) - r, float(py[i]) - r)))
+    screen.fblits(blit_seq)
+    # trails: one batched polyline per particle instead of a draw.line
+    # per segment (the per-segment alpha ramp is dropped; lines on the
+    # opaque display surface never blended it anyway), walked per color
+    # bucket so the color tuple is built once per bucket. The polylines
+    # themselves can't be concatenated into one call: draw.lines would
+    # connect separate trails with a stray segment.
+    for ci, group in enumerate(p.color_groups):
+        if len(group) == 0:
+            continue
+        color = (*COLOR_LIST[ci], 128)
+        for i in group:
+            trail = p.trails[i]
+            if len(trail) >= 2:
+                pygame.draw.lines(screen, color, False, trail, 2)
+
+def draw_renderer(p, renderer, interp=0.0):
+    # GPU path: cached textures drawn by the renderer; alpha blending
+    # happens on the GPU instead of the CPU blitters
+    px = p.x + p.vx * interp
+    py = p.y + p.vy * interp
+    visible = np.nonzero((px > -6) & (px < WIDTH + 6) &
+                         (py > -6) & (py < HEIGHT + 6) & p.big_mask)[0]
+    for i in visible:
+        r = p.r_int[i]
+        tex = p.textures[i]
+        tex.alpha = p.op_int[i]   # textures are shared per (radius, color)
+        tex.draw(dstrect=(float(px[i]) - r, float(py[i]) - r, r * 2, r * 2))
+    # radius <= 2 bodies: point draws grouped per (color, alpha) bucket,
+    # so the state stays constant and SDL's render batcher merges the run
+    # into one RenderDrawPoints (the renderer clips off-screen points)
+    for (ci, op), idxs in p.point_groups.items():
+        renderer.draw_color = (*COLOR_LIST[ci], op)
+        for i in idxs:
+            renderer.draw_point((float(px[i]), float(py[i])))
+    # trails grouped by color: the renderer draw color (a state change on
+    # the render batch) is set once per bucket instead of once per particle
+    for ci, group in enumerate(p.color_groups):
+        if len(group) == 0:
+            continue
+        renderer.draw_color = (*COLOR_LIST[ci], 128)
+        for i in group:
+            trail = p.trails[i]
+            if len(trail) >= 2:
+                prev = None
+                for pos in trail:
+                    if prev is not None:
+                        renderer.draw_line(prev, pos)
+                    prev = pos
+
+# Initialize screen. Preferred path: the SDL2 render API, which draws the
+# cached sprites as GPU textures and moves the per-pixel alpha blending off
+# the CPU. Falls back to a software display surface (SCALED|DOUBLEBUF so
+# SDL2 still presents via the GPU; the cached sprites convert_alpha against
+# this format) when the renderer cannot be created.
+USE_RENDERER = False
+screen = None
+renderer = None
+if HAVE_SDL2_VIDEO:
+    try:
+        window = Window("Complex Fluid Simulation", size=(WIDTH, HEIGHT))
+        renderer = Renderer(window, vsync=True)
+        USE_RENDERER = True
+    except pygame.error:
+        renderer = None
+if not USE_RENDERER:
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED | pygame.DOUBLEBUF, vsync=1)
+    pygame.display.set_caption("Complex Fluid Simulation")
 
 # Create particles
 NUM_PARTICLES = 400
-particles = [ParticleInteraction() for _ in range(NUM_PARTICLES)]
+particles = Particles(NUM_PARTICLES)
 
 # Clock for controlling frame rate
 clock = pygame.time.Clock()
 
+# Physics runs at a fixed 30 Hz behind an accumulator, decoupled from the
+# 60 Hz render cap: slow frames no longer drag the pairwise forces down
+# with them, and the force work per second is halved. Draw interpolates
+# between physics states with the accumulator remainder.
+PHYSICS_DT = 1.0 / 30.0
+accumulator = 0.0
+
 # Main loop
 running = True
 while running:
@@ -131,26 +497,60 @@ while running:
     mouse_x, mouse_y = pygame.mouse.get_pos()
     mouse_pressed = pygame.mouse.get_pressed()
 
-    # Update particles
-    for i, particle in enumerate(particles):
+    # Cap the frame rate and feed the physics accumulator (clamped so a
+    # long stall cannot queue an unbounded burst of catch-up steps)
+    accumulator += min(clock.tick(60) / 1000.0, 4 * PHYSICS_DT)
+
+    # Update particles (mouse branches hoisted: each kernel runs only on
+    # frames where its button is down)
+    while accumulator >= PHYSICS_DT:
+        accumulator -= PHYSICS_DT
+        if not HAVE_NUMBA:
+            if mouse_pressed[0]:
+                attract(particles, mouse_x, mouse_y)
+            if mouse_pressed[2]:
+                swirl(particles, mouse_x, mouse_y)
+            if HAVE_CYTHON:
+                pairwise_step(particles.x, particles.y,
+                              particles.vx, particles.vy,
+                              particles.repulsion_strength,
+                              np.float32(WIDTH), np.float32(HEIGHT))
+            else:
+                repel_all(particles)
+                move(particles)
+            record_trails(particles)
+            continue
         if mouse_pressed[0]:
-            particle.attract(mouse_x, mouse_y)
+            attract_kernel(particles.x, particles.y, particles.vx, particles.vy,
+                           np.float32(mouse_x), np.float32(mouse_y),
+                           particles.attraction_strength)
         if mouse_pressed[2]:
-            particle.swirl(mouse_x, mouse_y)
-        for j, other_particle in enumerate(particles):
-            if i != j:
-                particle.repel(other_particle)
-        particle.move()
+            swirl_kernel(particles.x, particles.y, particles.vx, particles.vy,
+                         np.float32(mouse_x), np.float32(mouse_y),
+                         particles.rotation_speed)
+        if NUM_PARTICLES > GRID_MIN_N:
+            cellx, celly, order, cell_start = bin_particles(particles.x, particles.y)
+            grid_step_kernel(particles.x, particles.y, particles.vx, particles.vy,
+                             cellx, celly, order, cell_start,
+                             particles.repulsion_strength,
+                             np.float32(WIDTH), np.float32(HEIGHT))
+        else:
+            step_kernel(particles.x, particles.y, particles.vx, particles.vy,
+                        particles.repulsion_strength,
+                        np.float32(WIDTH), np.float32(HEIGHT))
+        record_trails(particles)
 
     # Draw everything
-    screen.fill(BLACK)
-    for particle in particles:
-        particle.draw(screen)
-
-    pygame.display.flip()
-
-    # Cap the frame rate
-    clock.tick(60)
+    interp = accumulator / PHYSICS_DT
+    if USE_RENDERER:
+        renderer.draw_color = (*BLACK, 255)
+        renderer.clear()
+        draw_renderer(particles, renderer, interp)
+        renderer.present()
+    else:
+        screen.fill(BLACK)
+        draw(particles, screen, interp)
+        pygame.display.flip()
 
 # Quit pygame
 pygame.quit()
@@ -0,0 +1,13 @@
+# Builds the optional Cython kernel fluids.py falls back to when numba is
+# unavailable:  python setup_fluids_c.py build_ext --inplace
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+ext = Extension(
+    "_fluids_c",
+    ["_fluids_c.pyx"],
+    extra_compile_args=["-O3", "-march=native", "-ffast-math", "-fopenmp"],
+    extra_link_args=["-fopenmp"],
+)
+
+setup(ext_modules=cythonize(ext))